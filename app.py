@@ -1,6 +1,8 @@
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
+from flask_compress import Compress
 import logging
+import time
 from pathlib import Path
 import sys
 # tambah project root ke path
@@ -9,6 +11,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config import config
 from utils.retrieval import RetrievalSystem
 from utils.generation import GenerationSystem
+from utils.admission import TokenBucketLimiter, GenerationQueue
+from utils.response import OrjsonProvider, RESULT_FIELDS, DEFAULT_RESULT_FIELDS, project_results
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,14 +21,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 env = 'development'
 app.config.from_object(config[env])
 
 CORS(app)
+Compress(app)
 
 retrieval_system = None
 generation_system = None
+rate_limiter = None
+generation_queue = None
+
+BUSY_ANSWER = "Maaf, layanan jawaban sedang sibuk. Berikut hasil pencarian yang relevan."
 
 def get_retrieval_system():
     global retrieval_system
@@ -44,10 +54,31 @@ def get_generation_system():
         generation_system = GenerationSystem(
             model_name=app.config['LLM_MODEL'],
             temperature=app.config['LLM_TEMPERATURE'],
-            max_tokens=app.config['LLM_MAX_TOKENS']
+            max_tokens=app.config['LLM_MAX_TOKENS'],
+            request_timeout=app.config['REQUEST_TIMEOUT']
         )
     return generation_system
 
+def get_rate_limiter():
+    global rate_limiter
+    if rate_limiter is None:
+        rate_limiter = TokenBucketLimiter(
+            rate_per_minute=app.config['MAX_REQUESTS_PER_MINUTE'],
+            burst=app.config['RATE_LIMIT_BURST']
+        )
+    return rate_limiter
+
+def get_generation_queue():
+    global generation_queue
+    if generation_queue is None:
+        generation_queue = GenerationQueue(
+            max_concurrent=app.config['MAX_CONCURRENT_GENERATIONS'],
+            max_queue=app.config['MAX_GENERATION_QUEUE'],
+            initial_estimate=app.config['GENERATION_TIME_ESTIMATE'],
+            max_estimate=app.config['REQUEST_TIMEOUT']
+        )
+    return generation_queue
+
 #ROUTES
 @app.route('/')
 def index():
@@ -55,6 +86,19 @@ def index():
 
 @app.route('/api/search', methods=['POST'])
 def search():
+    """Search chunks, optionally with a generated answer. `fields` selects result
+    fields (default: snippet instead of chunk_text); references are indices into `results`."""
+    deadline = time.monotonic() + app.config['REQUEST_TIMEOUT']
+
+    allowed, retry_after = get_rate_limiter().allow(request.remote_addr or 'unknown')
+    if not allowed:
+        logger.warning(f"Rate limit exceeded for {request.remote_addr}")
+        response = jsonify({
+            'error': 'Too many requests, please slow down'
+        })
+        response.headers['Retry-After'] = str(int(retry_after) + 1)
+        return response, 429
+
     try:
         data=request.get_json()
 
@@ -66,11 +110,24 @@ def search():
         query = data['query'].strip()
         top_k = min(data.get('top_k', app.config['DEFAULT_TOP_K']), app.config['MAX_TOP_K'])
         generate_answer = data.get('generate_answer', False)
+        fields = data.get('fields', list(DEFAULT_RESULT_FIELDS))
+        snippet_length = data.get('snippet_length', app.config['DEFAULT_SNIPPET_LENGTH'])
 
         if not query:
             return jsonify({
                 'error': 'Query cannot be empty'
             }), 400
+
+        if not isinstance(fields, list) or any(f not in RESULT_FIELDS for f in fields):
+            return jsonify({
+                'error': f"fields must be a list of: {', '.join(RESULT_FIELDS)}"
+            }), 400
+
+        if not isinstance(snippet_length, int) or isinstance(snippet_length, bool):
+            return jsonify({
+                'error': 'snippet_length must be an integer'
+            }), 400
+        snippet_length = max(1, min(snippet_length, app.config['MAX_SNIPPET_LENGTH']))
         
         logger.info(f"Search request: query='{query}', top_k={top_k}, generate={generate_answer}")
 
@@ -80,24 +137,61 @@ def search():
         response = {
             'query': query,
             'num_results': len(results),
-            'results':results
+            'results': project_results(results, fields, query=query, snippet_length=snippet_length)
         }
 
         #generate answer if requested
         if generate_answer:
-            generation = get_generation_system()
-            generation_result = generation.generate_answer(
-                query=query,
-                retrieved_chunks=results,
-                max_context_chunks=app.config['MAX_CONTEXT_CHUNKS']
-            )
+            queue = get_generation_queue()
+            admitted, reason = queue.acquire(deadline)
+
+            if admitted:
+                start = time.monotonic()
+                duration = None
+                try:
+                    generation = get_generation_system()
+                    generation_result = generation.generate_answer(
+                        query=query,
+                        retrieved_chunks=results,
+                        max_context_chunks=app.config['MAX_CONTEXT_CHUNKS'],
+                        timeout=max(deadline - start, 1.0)
+                    )
+                    #sukses: durasi asli; timeout: LLM jenuh, anggap paling lambat
+                    #error cepat lain (koneksi) tidak dipakai untuk estimasi
+                    if 'error' not in generation_result:
+                        duration = time.monotonic() - start
+                    elif generation_result.get('timed_out'):
+                        duration = queue.max_estimate
+                finally:
+                    queue.release(duration)
+
+                if generation_result.get('timed_out'):
+                    logger.warning(f"Generation timed out for query='{query}'")
+                    generation_result = {
+                        'answer': BUSY_ANSWER,
+                        'context_chunks_used': 0
+                    }
+                    response['degraded'] = True
+                    response['degraded_reason'] = 'timeout'
+            else:
+                #LLM penuh: degradasi ke retrieval-only, jangan ikut antri
+                logger.warning(f"Generation shed ({reason}) for query='{query}'")
+                generation_result = {
+                    'answer': BUSY_ANSWER,
+                    'context_chunks_used': 0
+                }
+                response['degraded'] = True
+                response['degraded_reason'] = reason
+
             #cited reference
             response['answer'] = generation_result['answer']
             response['context_chunks_used']=generation_result['context_chunks_used']
 
-            #additional reference
-            response['cited_references']=results[:app.config['MAX_CONTEXT_CHUNKS']]
-            response['additional_references']=results[app.config['MAX_CONTEXT_CHUNKS']:]
+            #references sebagai index ke 'results', tidak dikirim ulang
+            #degraded/error: context_chunks_used=0, jadi tidak ada yang dikutip
+            cited = generation_result['context_chunks_used']
+            response['cited_references']=list(range(cited))
+            response['additional_references']=list(range(cited, len(results)))
         return jsonify(response)
     except Exception as e:
         logger.error(f"Error in search: {e}")
@@ -115,6 +209,13 @@ def stats():
         logger.error(f"Error geting stats: {e}")
         return jsonify({'error': str(e)}), 500
     
+@app.route('/api/metrics')
+def metrics():
+    return jsonify({
+        'generation_queue': get_generation_queue().get_metrics(),
+        'rate_limiter': get_rate_limiter().get_metrics()
+    })
+
 @app.route('/health') #cek
 def health():
     try:
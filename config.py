@@ -33,9 +33,22 @@ class Config:
     #generation settings
     MAX_CONTEXT_CHUNKS = 5
 
+    #response settings
+    DEFAULT_SNIPPET_LENGTH = 240  # characters
+    MAX_SNIPPET_LENGTH = 1000
+    COMPRESS_MIMETYPES = ['application/json', 'text/html', 'text/css', 'application/javascript']
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = 500  # bytes
+
     #api settings
     MAX_REQUESTS_PER_MINUTE = 60
     REQUEST_TIMEOUT = 30  # seconds
+    RATE_LIMIT_BURST = 10
+
+    #admission control (generation)
+    MAX_CONCURRENT_GENERATIONS = 1
+    MAX_GENERATION_QUEUE = 4
+    GENERATION_TIME_ESTIMATE = 10.0  # seconds, initial estimate before any generation finished
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,171 @@
+# test_admission.py
+
+"""
+Unit tests for rate limiting and generation admission (no server needed)
+"""
+
+import time
+import threading
+
+from utils import admission
+from utils.admission import TokenBucketLimiter, GenerationQueue
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+def with_fake_clock(func):
+    def wrapper():
+        clock = FakeClock()
+        real_time = admission.time
+        admission.time = clock
+        try:
+            func(clock)
+        finally:
+            admission.time = real_time
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+@with_fake_clock
+def test_token_bucket_burst_and_retry_after(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+
+    assert all(limiter.allow('a')[0] for _ in range(3))
+    allowed, retry_after = limiter.allow('a')
+    assert not allowed
+    assert 0 < retry_after <= 1.0
+
+    #client lain punya bucket sendiri
+    assert limiter.allow('b')[0]
+    assert limiter.get_metrics() == {'tracked_clients': 2, 'rejected_total': 1}
+
+
+@with_fake_clock
+def test_token_bucket_refill(clock):
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+    limiter.allow('a')
+    limiter.allow('a')
+    assert not limiter.allow('a')[0]
+
+    clock.now += 1.0
+    assert limiter.allow('a')[0]
+    assert not limiter.allow('a')[0]
+
+    #refill tidak melebihi burst
+    clock.now += 60
+    assert limiter.allow('a')[0]
+    assert limiter.allow('a')[0]
+    assert not limiter.allow('a')[0]
+
+
+def test_queue_full_is_shed():
+    queue = GenerationQueue(max_concurrent=1, max_queue=1, initial_estimate=1.0)
+    assert queue.acquire(time.monotonic() + 30) == (True, '')
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(queue.acquire(time.monotonic() + 30)))
+    waiter.start()
+    while queue.get_metrics()['queue_depth'] < 1:
+        time.sleep(0.01)
+
+    assert queue.acquire(time.monotonic() + 30) == (False, 'queue_full')
+
+    queue.release(1.0)
+    waiter.join()
+    assert results == [(True, '')]
+    queue.release(1.0)
+
+    metrics = queue.get_metrics()
+    assert metrics['active'] == 0
+    assert metrics['admitted_total'] == 2
+    assert metrics['shed_queue_full_total'] == 1
+
+
+def test_deadline_shedding_when_busy():
+    queue = GenerationQueue(max_concurrent=1, max_queue=4, initial_estimate=5.0)
+    assert queue.acquire(time.monotonic() + 30)[0]
+
+    #harus menunggu ~5s + generasi ~5s, tidak muat dalam 3s
+    assert queue.acquire(time.monotonic() + 3) == (False, 'deadline')
+    assert queue.get_metrics()['shed_deadline_total'] == 1
+    queue.release(5.0)
+
+
+def test_idle_queue_recovers_from_slow_estimate():
+    queue = GenerationQueue(max_concurrent=1, max_queue=4, initial_estimate=10.0, max_estimate=30.0)
+    for _ in range(17):
+        assert queue.acquire(time.monotonic() + 60)[0]
+        queue.release(30.0)
+    assert queue.get_metrics()['avg_generation_seconds'] <= 30.0
+
+    #antrian kosong: tetap diterima walau estimasi mendekati deadline
+    assert queue.acquire(time.monotonic() + 29.5) == (True, '')
+    queue.release(2.0)
+    assert queue.get_metrics()['avg_generation_seconds'] < 29.55
+
+
+def test_estimate_is_clamped_and_ignores_failures():
+    queue = GenerationQueue(initial_estimate=10.0, min_estimate=1.0, max_estimate=30.0)
+
+    queue.acquire(time.monotonic() + 60)
+    queue.release(None)
+    assert queue.get_metrics()['avg_generation_seconds'] == 10.0
+
+    for _ in range(50):
+        queue.acquire(time.monotonic() + 60)
+        queue.release(0.0)
+    assert queue.get_metrics()['avg_generation_seconds'] == 1.0
+
+    for _ in range(50):
+        queue.acquire(time.monotonic() + 60)
+        queue.release(500.0)
+    assert queue.get_metrics()['avg_generation_seconds'] == 30.0
+
+
+def test_timeouts_make_waiters_shed_fast():
+    queue = GenerationQueue(max_concurrent=1, max_queue=4, initial_estimate=10.0, max_estimate=30.0)
+
+    #generasi timeout dilaporkan sebagai max_estimate
+    for _ in range(5):
+        queue.acquire(time.monotonic() + 30)
+        queue.release(queue.max_estimate)
+
+    assert queue.acquire(time.monotonic() + 30)[0]
+    start = time.monotonic()
+    assert queue.acquire(time.monotonic() + 30) == (False, 'deadline')
+    assert time.monotonic() - start < 0.5
+    queue.release(None)
+
+
+def main():
+    tests = [
+        test_token_bucket_burst_and_retry_after,
+        test_token_bucket_refill,
+        test_queue_full_is_shed,
+        test_deadline_shedding_when_busy,
+        test_idle_queue_recovers_from_slow_estimate,
+        test_estimate_is_clamped_and_ignores_failures,
+        test_timeouts_make_waiters_shed_fast,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+            print(f"PASS - {test_func.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL - {test_func.__name__} {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    exit(0 if main() else 1)
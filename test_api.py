@@ -7,6 +7,8 @@ Script to test Flask API endpoints
 import requests
 import json
 import time
+import re
+import html
 
 BASE_URL = 'http://localhost:5000'
 
@@ -105,6 +107,57 @@ def test_search_with_generation():
     return response.status_code == 200
 
 
+def test_search_lean_fields():
+    """Test field projection and bounded snippets"""
+    print("\n" + "-"*60)
+    print("TEST 5: Search (Lean Fields + Snippet)")
+    print("-"*60)
+    
+    fields = ['judul', 'similarity', 'snippet']
+    snippet_length = 80
+    payload = {
+        'query': 'Apa itu machine learning?',
+        'top_k': 10,
+        'fields': fields,
+        'snippet_length': snippet_length
+    }
+    
+    print(f"Request: {json.dumps(payload, indent=2)}")
+    
+    response = requests.post(f'{BASE_URL}/api/search', json=payload)
+    print(f"\nStatus Code: {response.status_code}")
+    
+    if response.status_code != 200:
+        print(f"Error: {response.text}")
+        return False
+    
+    ok = True
+    for result in response.json()['results']:
+        # tanpa <mark> dan escape, plus maksimal 2 tanda elipsis
+        plain = html.unescape(re.sub(r'</?mark>', '', result.get('snippet', '')))
+        if sorted(result) != sorted(fields) or len(plain) > snippet_length + 2:
+            print(f"  Unexpected result: {result}")
+            ok = False
+    
+    invalid = requests.post(f'{BASE_URL}/api/search', json={**payload, 'snippet_length': 'x'})
+    print(f"Invalid snippet_length status: {invalid.status_code}")
+    
+    return ok and invalid.status_code == 400
+
+
+def test_metrics():
+    """Test admission-control metrics endpoint"""
+    print("\n" + "="*60)
+    print("TEST 6: Admission Metrics")
+    print("="*60)
+    
+    response = requests.get(f'{BASE_URL}/api/metrics')
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    
+    return response.status_code == 200
+
+
 def main():
     print("\n" + "-"*60)
     print("# FLASK API TESTING")
@@ -115,6 +168,8 @@ def main():
         ('Statistics', test_stats),
         ('Search (No Generation)', test_search_without_generation),
         ('Search + Generation', test_search_with_generation),
+        ('Search (Lean Fields)', test_search_lean_fields),
+        ('Admission Metrics', test_metrics),
     ]
     
     results = []
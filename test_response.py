@@ -0,0 +1,112 @@
+# test_response.py
+
+"""
+Unit tests for response projection, snippets and JSON serialization (no server needed)
+"""
+
+import re
+import html
+import json
+
+import numpy as np
+from flask import Flask
+
+from utils.response import (
+    OrjsonProvider, DEFAULT_RESULT_FIELDS, _query_pattern, make_snippet, project_results
+)
+
+LONG_TEXT = (
+    "Kapasitas situasi jaringan dibahas di bagian awal. " * 10
+    + "Machine learning adalah cabang <AI> & statistik yang belajar dari data. "
+    + "Penelitian lanjutan tentang optimasi. " * 10
+)
+
+
+def plain(snippet):
+    return html.unescape(re.sub(r'</?mark>', '', snippet))
+
+
+def test_snippet_length_bound_with_ellipsis():
+    pattern = _query_pattern('Apa itu machine learning?')
+    for max_length in (1, 40, 80, 240):
+        snippet = make_snippet(LONG_TEXT, pattern, max_length)
+        #maksimal dua elipsis di luar batas panjang
+        assert len(plain(snippet)) <= max_length + 2
+        assert snippet.startswith('…') or snippet.endswith('…')
+
+    assert len(plain(make_snippet(LONG_TEXT, pattern, -5))) <= 1 + 2
+
+
+def test_snippet_highlights_whole_words_only():
+    snippet = make_snippet(LONG_TEXT, _query_pattern('Apa itu machine learning?'), 120)
+
+    assert '<mark>Machine</mark> <mark>learning</mark>' in snippet
+    #stop word tidak di-highlight dan tidak ada match di tengah kata
+    assert 'K<mark>' not in snippet and 's<mark>' not in snippet
+    assert re.findall(r'<mark>(.*?)</mark>', snippet) == ['Machine', 'learning']
+
+
+def test_snippet_escapes_html():
+    snippet = make_snippet(LONG_TEXT, _query_pattern('machine learning'), 120)
+    assert '&lt;AI&gt; &amp; statistik' in snippet
+    assert '<AI>' not in snippet
+
+
+def test_snippet_without_match_or_short_text():
+    snippet = make_snippet(LONG_TEXT, _query_pattern('blockchain'), 60)
+    assert '<mark>' not in snippet
+    assert LONG_TEXT.startswith(plain(snippet).rstrip('…'))
+
+    assert _query_pattern('apa itu?') is None
+    assert make_snippet('pendek  &\nsingkat', None, 120) == 'pendek &amp; singkat'
+
+
+def test_project_results_key_set():
+    results = [{
+        'chunk_id': 1, 'chunk_text': LONG_TEXT, 'judul': 'J', 'author': 'A',
+        'tahun': 2020, 'url': '#', 'section': 'intro', 'similarity': 0.5
+    }]
+
+    projected = project_results(results, DEFAULT_RESULT_FIELDS, query='machine learning', snippet_length=80)
+    assert set(projected[0]) == set(DEFAULT_RESULT_FIELDS)
+    assert 'chunk_text' not in projected[0]
+
+    projected = project_results(results, ['judul', 'chunk_text'])
+    assert projected == [{'judul': 'J', 'chunk_text': LONG_TEXT}]
+
+
+def test_orjson_provider_numpy_and_nan():
+    provider = OrjsonProvider(Flask(__name__))
+    obj = {'id': np.int64(3), 'score': np.float32(0.5), 'tahun': float('nan')}
+
+    assert provider.dumps(obj) == '{"id":3,"score":0.5,"tahun":null}'
+    assert provider.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+    #fallback stdlib (indent) tetap bisa menangani numpy
+    assert json.loads(provider.dumps(obj, indent=2)) == {'id': 3, 'score': 0.5, 'tahun': None}
+
+
+def main():
+    tests = [
+        test_snippet_length_bound_with_ellipsis,
+        test_snippet_highlights_whole_words_only,
+        test_snippet_escapes_html,
+        test_snippet_without_match_or_short_text,
+        test_project_results_key_set,
+        test_orjson_provider_numpy_and_nan,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+            print(f"PASS - {test_func.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL - {test_func.__name__} {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    exit(0 if main() else 1)
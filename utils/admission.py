@@ -0,0 +1,153 @@
+import threading
+import time
+import logging
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `rate_per_minute` sustained, up to `burst` at once."""
+
+    def __init__(self, rate_per_minute=60, burst=None, idle_ttl=600):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or rate_per_minute)
+        self.idle_ttl = idle_ttl
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+        self.rejected = 0
+
+        logger.info(f"Rate limiter initialized: {rate_per_minute}/min, burst={self.capacity:g}")
+
+    def allow(self, client_id: str) -> Tuple[bool, float]:
+        """Take one token for `client_id`. Returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(client_id, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+
+            if tokens >= 1.0:
+                self._buckets[client_id] = (tokens - 1.0, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[client_id] = (tokens, now)
+                self.rejected += 1
+                allowed, retry_after = False, (1.0 - tokens) / self.rate
+
+            if now - self._last_prune > self.idle_ttl:
+                self._prune(now)
+
+        return allowed, retry_after
+
+    def _prune(self, now):
+        #bucket yang idle sudah penuh lagi, aman dibuang
+        stale = [k for k, (_, last) in self._buckets.items() if now - last > self.idle_ttl]
+        for k in stale:
+            del self._buckets[k]
+        self._last_prune = now
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                'tracked_clients': len(self._buckets),
+                'rejected_total': self.rejected
+            }
+
+
+class GenerationQueue:
+    """Bounded, deadline-aware admission for LLM generation.
+
+    At most `max_concurrent` generations run at once and at most `max_queue`
+    requests wait for a slot. A request is shed immediately when the queue is
+    full or when the estimated wait plus generation time would overrun its
+    deadline, so callers can fall back to retrieval-only responses instead of
+    piling up behind Ollama. A request that finds a free slot and nobody
+    waiting is always admitted, so a pessimistic estimate cannot lock
+    generation out; the estimate is clamped to [min_estimate, max_estimate].
+    """
+
+    def __init__(self, max_concurrent=1, max_queue=4, initial_estimate=10.0, smoothing=0.2,
+                 min_estimate=1.0, max_estimate=60.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.smoothing = smoothing
+        self.min_estimate = min_estimate
+        self.max_estimate = max_estimate
+        self.avg_duration = self._clamp(float(initial_estimate))
+
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+
+        logger.info(f"Generation queue initialized: concurrency={max_concurrent}, queue={max_queue}")
+
+    def _clamp(self, value: float) -> float:
+        return max(self.min_estimate, min(self.max_estimate, value))
+
+    def _estimated_wait(self) -> float:
+        #perkiraan kasar: antrian di depan dibagi rata ke semua slot
+        ahead = self.waiting + max(0, self.active - self.max_concurrent + 1)
+        return ahead * self.avg_duration / self.max_concurrent
+
+    def acquire(self, deadline: float) -> Tuple[bool, str]:
+        """Wait for a generation slot until `deadline` (time.monotonic()).
+
+        Returns (admitted, reason); reason is '' when admitted, otherwise
+        'queue_full' or 'deadline'.
+        """
+        with self._cond:
+            if self.active < self.max_concurrent and self.waiting == 0:
+                #slot kosong: langsung jalan, deadline dibatasi lewat timeout ollama
+                self.active += 1
+                self.admitted += 1
+                return True, ''
+
+            now = time.monotonic()
+            if self.active >= self.max_concurrent and self.waiting >= self.max_queue:
+                self.shed_queue_full += 1
+                return False, 'queue_full'
+
+            if now + self._estimated_wait() + self.avg_duration > deadline:
+                self.shed_deadline += 1
+                return False, 'deadline'
+
+            self.waiting += 1
+            try:
+                while self.active >= self.max_concurrent:
+                    #slot harus didapat cukup awal supaya generasi masih sempat selesai
+                    remaining = deadline - self.avg_duration - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_deadline += 1
+                        return False, 'deadline'
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+            return True, ''
+
+    def release(self, duration: float = None):
+        """Free a slot; `duration` (seconds) of a successful generation updates
+        the estimate. Pass None for failed generations."""
+        with self._cond:
+            self.active -= 1
+            if duration is not None:
+                self.avg_duration = self._clamp(self.avg_duration + self.smoothing * (duration - self.avg_duration))
+            self._cond.notify()
+
+    def get_metrics(self) -> Dict:
+        with self._cond:
+            return {
+                'active': self.active,
+                'queue_depth': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'admitted_total': self.admitted,
+                'shed_queue_full_total': self.shed_queue_full,
+                'shed_deadline_total': self.shed_deadline,
+                'avg_generation_seconds': round(self.avg_duration, 3)
+            }
@@ -1,14 +1,16 @@
 import ollama
+import httpx
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 class GenerationSystem:
-    def __init__(self, model_name='gemma2:9b', temperature=0.3, max_tokens=500):
+    def __init__(self, model_name='gemma2:9b', temperature=0.3, max_tokens=500, request_timeout=None):
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.client = ollama.Client(timeout=request_timeout)
         
         self._test_connection()
 
@@ -16,25 +18,33 @@ class GenerationSystem:
 
     def _test_connection(self):
         try:
-            ollama.list()
+            self.client.list()
             logger.info("Ollama connection success")
         except Exception as e:
             logger.error(f"cannot connect to ollama: {e}")
             raise ConnectionError("Ollama service not available. Please start ollama")
         
-    def generate_answer(self, query: str, retrieved_chunks: List[Dict], max_context_chunks: int = 5) -> Dict:
+    def generate_answer(self, query: str, retrieved_chunks: List[Dict], max_context_chunks: int = 5,
+                        timeout: Optional[float] = None) -> Dict:
         try:
             context = self._build_context(retrieved_chunks[:max_context_chunks])
             prompt = self._build_prompt(query, context)
 
-            response = ollama.generate(
-                model=self.model_name,
-                prompt = prompt,
-                options={
-                    'temperature': self.temperature,
-                    'num_predict': self.max_tokens
-                }
-            )
+            #timeout per request (sisa waktu), selain itu pakai client default
+            client = ollama.Client(timeout=timeout) if timeout is not None else self.client
+            try:
+                response = client.generate(
+                    model=self.model_name,
+                    prompt = prompt,
+                    options={
+                        'temperature': self.temperature,
+                        'num_predict': self.max_tokens
+                    }
+                )
+            finally:
+                #ollama.Client tidak punya close(), tutup pool httpx-nya langsung
+                if client is not self.client:
+                    client._client.close()
 
             answer = response['response']
             logger.info(f"Generated answer for query: '{query}")
@@ -51,7 +61,8 @@ class GenerationSystem:
                 'answer': f"Maaf, terjadi kesalahan dalam menghasilkan jawaban: {str(e)}",
                 'context_chunks_used': 0,
                 'model': self.model_name,
-                'error': str(e)
+                'error': str(e),
+                'timed_out': isinstance(e, httpx.TimeoutException)
             }
         
     def _build_context(self, chunks: List[Dict])->str:
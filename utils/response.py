@@ -0,0 +1,121 @@
+import re
+import html
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from typing import List, Dict, Iterable, Optional
+
+RESULT_FIELDS = ('chunk_id', 'chunk_text', 'snippet', 'judul', 'author', 'tahun', 'url', 'section', 'similarity')
+DEFAULT_RESULT_FIELDS = ('chunk_id', 'snippet', 'judul', 'author', 'tahun', 'url', 'section', 'similarity')
+
+_WORD_RE = re.compile(r'\w{3,}', re.UNICODE)
+#kata tanya/sambung yang tidak perlu di-highlight
+_STOP_WORDS = {
+    'apa', 'itu', 'ini', 'yang', 'dan', 'atau', 'dari', 'untuk', 'dengan', 'pada', 'dalam',
+    'adalah', 'bagaimana', 'mengapa', 'kenapa', 'siapa', 'kapan', 'dimana', 'apakah', 'oleh',
+    'the', 'and', 'for', 'what', 'how', 'why', 'with', 'from', 'are'
+}
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (also handles numpy scalars from pandas rows).
+
+    `sort_keys` (attribute or kwarg) maps to OPT_SORT_KEYS and is off by
+    default. Responses are always compact, `compact` is ignored. Any other
+    `dumps` kwarg (e.g. `indent`) falls back to the stdlib json provider, after
+    an orjson round-trip so numpy scalars and NaN are already plain JSON values.
+    """
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    sort_keys = False
+
+    def _option(self, sort_keys) -> int:
+        return self.option | orjson.OPT_SORT_KEYS if sort_keys else self.option
+
+    def dumps(self, obj, **kwargs) -> str:
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        if kwargs:
+            obj = orjson.loads(orjson.dumps(obj, default=self.default, option=self.option))
+            return super().dumps(obj, sort_keys=sort_keys, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option(sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        #langsung bytes, tanpa pretty-print walaupun DEBUG
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(self.sort_keys)),
+            mimetype=self.mimetype
+        )
+
+
+def _query_pattern(query: str) -> Optional[re.Pattern]:
+    terms = {t.lower() for t in _WORD_RE.findall(query)} - _STOP_WORDS
+    if not terms:
+        return None
+    alternation = '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternation})\b', re.IGNORECASE)
+
+
+def make_snippet(text, pattern: Optional[re.Pattern], max_length: int = 240) -> str:
+    """Return an HTML-escaped window of at most `max_length` chars around the
+    densest cluster of query terms, with the terms wrapped in <mark>."""
+    max_length = max(1, max_length)
+    text = ' '.join(str(text).split())
+    matches = list(pattern.finditer(text)) if pattern else []
+
+    start = 0
+    if len(text) > max_length and matches:
+        best_hits = 0
+        j = 0
+        for i, m in enumerate(matches):
+            while j < len(matches) and matches[j].end() <= m.start() + max_length:
+                j += 1
+            if j - i > best_hits:
+                best_hits, start = j - i, m.start()
+        #sedikit konteks sebelum term pertama
+        start = max(0, min(start - max_length // 5, len(text) - max_length))
+        if start > 0:
+            space = text.find(' ', start)
+            if 0 <= space - start < max_length // 5:
+                start = space + 1
+
+    end = min(len(text), start + max_length)
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        if space > start:
+            end = space
+
+    parts = []
+    pos = start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(html.escape(text[pos:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group())}</mark>")
+        pos = m.end()
+    parts.append(html.escape(text[pos:end]))
+
+    snippet = ''.join(parts)
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(text):
+        snippet = snippet + '…'
+    return snippet
+
+
+def project_results(results: List[Dict], fields: Iterable[str], query: str = '', snippet_length: int = 240) -> List[Dict]:
+    """Keep only `fields` of every result; 'snippet' is built from chunk_text."""
+    fields = tuple(fields)
+    pattern = _query_pattern(query) if 'snippet' in fields else None
+
+    projected = []
+    for result in results:
+        item = {}
+        for field in fields:
+            if field == 'snippet':
+                item['snippet'] = make_snippet(result['chunk_text'], pattern, snippet_length)
+            else:
+                item[field] = result.get(field)
+        projected.append(item)
+    return projected
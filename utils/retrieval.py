@@ -80,8 +80,7 @@ class RetrievalSystem:
                     'tahun': chunk_info.get('tahun_terbit', 'N/A'),
                     'url': chunk_info.get('url', '#'),
                     'section': chunk_info.get('chunk_section', 'unknown'),
-                    'similarity': similarity,
-                    'similarity_score': similarity
+                    'similarity': similarity
                 })
 
             logger.info(f"Retrieved {len(results)} results for query: '{query}'")